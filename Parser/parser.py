@@ -1,5 +1,6 @@
 from anytree import Node, RenderTree, PreOrderIter
 from scanner.tokens import TokenType
+from tables import tables
 import os
 import json
 
@@ -378,6 +379,9 @@ class AstParser:
 class LL1:
     def __init__(self, token_generator, grammar, code_generator):
         self.token_generator = token_generator
+        # significant tokens come in batches, each with the line the scanner was on after reading it
+        self.tokens = iter(token_generator)
+        self.line_no = None
         self.grammar = grammar
         self.code_gen = code_generator
         self.p_table = {}
@@ -408,7 +412,7 @@ class LL1:
 
     # ----------------- errors -----------------
     def add_error(self, error_root, error_type):
-        line_no = self.token_generator.get_line_no()
+        line_no = self.line_no
         if error_type.lower() == "missing":
             self.errors.append((line_no, f"{error_type} {error_root.name}"))
         elif error_type.lower() == "illegal":
@@ -473,18 +477,18 @@ class LL1:
     # ------------- token handling --------------
     def get_next_valid_token(self):
         try:
-            token = self.token_generator.get_next_token()
-            # skip trivia / errors
-            while token.type in [TokenType.COMMENT, TokenType.WHITE_SPACE, TokenType.ERROR]:
-                token = self.token_generator.get_next_token()
+            # trivia / errors are already dropped by the scanner
+            line_no, token = next(self.tokens)
+            self.line_no = line_no
 
-            # snapshot for AST: (line, type_name, lexeme)
-            line_no = self.token_generator.get_line_no()
+            # snapshot for AST: (line, type_name, lexeme); lexemes are shared through the intern pool
             type_name = token.type.name
-            lexeme = token.lexeme
+            lexeme = tables.get_intern_pool().canonical(token.lexeme)
             self._ast_tokens.append((line_no, type_name, lexeme))
 
             return token
+        except tables.LexicalErrorStorm:
+            raise
         except Exception:
             # ensure EOF token is present for AST stage
             if self._ast_tokens:
@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -17,6 +18,9 @@ class AstNode:
     def from_dict(d: Dict[str, Any]) -> 'AstNode':
         node_type = d.get("NodeType")
         value = d.get("Value")
+        if isinstance(value, str):
+            # one shared copy per name, kept out of the scanner's intern pool
+            value = sys.intern(value)
         raw_children = d.get("Children", []) or []
         children = [AstNode.from_dict(c) for c in raw_children]
         return AstNode(node_type, value, children)
@@ -1,11 +1,30 @@
+import argparse
+import sys
+from functools import partial
+
 from Parser import init_grammar
 from Parser.parser import LL1
+from scanner.ascii_scanner import build_ascii_scanner
 from code_gen.code_gen import Helper
-from scanner.default_scanner import build_scanner
+from scanner.default_scanner import build_scanner, build_stream_scanner, default_automaton
+from scanner.generated_scanner import build_generated_scanner
+from scanner.parallel_scanner import scan_parallel
+from scanner.regex_scanner import build_regex_scanner
+from scanner.vector_scanner import build_vector_scanner
 from scanner.tokens import Token, TokenType
 from tables import tables
 from code_gen import CodeGen
 
+# nothing the compiler does looks at comment or whitespace tokens, so the DFA scanner never makes them
+SCANNER_ENGINES = {"dfa": partial(build_scanner, skip_trivia=True), "regex": build_regex_scanner, "vector": build_vector_scanner,
+                   "generated": build_generated_scanner, "ascii": build_ascii_scanner}
+
+
+def build_stdin_scanner(source):
+    # source is "-"; the stream reader already replaces bytes that are not UTF-8, with or without an error budget
+    return build_stream_scanner(sys.stdin.buffer, skip_trivia=True)
+
+
 def run_code_gen() -> None:
 
     try:
@@ -24,17 +43,83 @@ def run_code_gen() -> None:
         print(f"An error occurred: {ex}")
     print("--------------------------------------\n")
 
-tables.symbol_table.add_symbol(Token(TokenType.ID, "output"))
-tables.symbol_table.fetch("output").address = 5
-tables.symbol_table.export("symbol_table.txt")
-parser = LL1(build_scanner("input.txt"), init_grammar(),None)
-parser.generate_parse_tree()
-parser.export_ast('.')
-parser.export_parse_tree("parse_tree.txt")
-parser.export_syntax_error("syntax_errors.txt")
 
-run_code_gen()
-# parser.code_gen.execute_from("main")
-# parser.export_code("output.txt")
+def run_lexer(build, source, jobs) -> None:
+    try:
+        if jobs > 1:
+            scan_parallel(source, max_workers=jobs)
+        else:
+            scanner = build(source)
+            while scanner.can_generate_token():
+                scanner.get_next_token()
+    finally:  # what was scanned before an error storm aborted the scan is still written out
+        tables.get_token_table().export("tokens.txt")
+        tables.get_error_table().export("lexical_errors.txt")
+        tables.get_symbol_table().export("symbol_table.txt")
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="C-minus compiler")
+    arguments.add_argument("source", nargs="?", default="input.txt",
+                           help="C-minus source file, - streams it from standard input (default: input.txt)")
+    arguments.add_argument("--engine", choices=SCANNER_ENGINES, default="dfa", help="scanner engine used to lex the source")
+    arguments.add_argument("--lex-only", action="store_true",
+                           help="only scan the source and export tokens.txt, lexical_errors.txt and symbol_table.txt")
+    arguments.add_argument("--jobs", type=int, default=1,
+                           help="with --lex-only and the dfa engine, lex chunks of the source in this many processes")
+    arguments.add_argument("--dfa-snapshot", metavar="PATH",
+                           help="load the compiled scanner automaton from this pickle, writing it there first if missing")
+    arguments.add_argument("--coalesce-errors", action="store_true",
+                           help="report a run of invalid characters on one line as a single lexical error")
+    arguments.add_argument("--max-errors-per-line", type=int, metavar="N", help="keep at most N lexical errors per line")
+    arguments.add_argument("--max-errors", type=int, metavar="N", help="keep at most N lexical errors in all")
+    arguments.add_argument("--max-invalid-ratio", type=float, metavar="R",
+                           help="abort once invalid characters are more than this share of the input scanned")
+    options = arguments.parse_args()
+    if options.jobs > 1 and (options.engine != "dfa" or not options.lex_only):
+        arguments.error("--jobs lexes with the dfa engine only and needs --lex-only")
+    budget = tables.ErrorBudget(options.coalesce_errors, options.max_errors_per_line, options.max_errors,
+                                options.max_invalid_ratio)
+    if budget != tables.NO_BUDGET:
+        if options.jobs > 1:
+            arguments.error("lexical error budgets need --jobs 1")
+        tables.set_error_budget(budget)
+    if options.dfa_snapshot:
+        default_automaton(options.dfa_snapshot)
+    if options.source == "-":
+        if options.engine != "dfa" or options.jobs > 1:
+            arguments.error("reading from standard input needs --engine dfa and --jobs 1")
+        build = build_stdin_scanner
+    else:
+        build = SCANNER_ENGINES[options.engine]
+        if budget != tables.NO_BUDGET:  # binary input has to reach the budget, not stop at the first byte that is not UTF-8
+            build = partial(build, errors="replace")
+
+    try:
+        compile_source(build, options)
+    except tables.LexicalErrorStorm as storm:
+        sys.exit(f"lexical error storm: {storm}")
+    if budget != tables.NO_BUDGET:
+        print(tables.get_error_table().summary())
+
+
+def compile_source(build, options) -> None:
+    if options.lex_only:
+        run_lexer(build, options.source, options.jobs)
+    else:
+        tables.symbol_table.add_symbol(Token(TokenType.ID, "output"))
+        tables.symbol_table.fetch("output").address = 5
+        tables.symbol_table.export("symbol_table.txt")
+        parser = LL1(build(options.source), init_grammar(),None)
+        parser.generate_parse_tree()
+        parser.export_ast('.')
+        parser.export_parse_tree("parse_tree.txt")
+        parser.export_syntax_error("syntax_errors.txt")
+
+        run_code_gen()
+    # parser.code_gen.execute_from("main")
+    # parser.export_code("output.txt")
 
 
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from scanner.tokens import Token, TokenType
+from scanner.tokens import LEXEME_TOKENS, Token, TokenType
 from tables import tables
 
 
@@ -15,19 +15,22 @@ def id_token_gen(line_no, lexeme):
 
 
 def symbol_token_gen(line_no, lexeme):
-    token = Token(TokenType(sum(ord(c) for c in lexeme)), lexeme)
+    token = LEXEME_TOKENS[lexeme]
     tables.get_token_table().add_token(line_no, token)
     return token
 
 
-def comment_token_gen(line_no, lexeme): return Token(TokenType.COMMENT, lexeme)
+def comment_token_gen(line_no, lexeme):
+    tables.error_table.end_run()
+    return Token(TokenType.COMMENT, lexeme)
 
 
 def whitespace_token_gen(line_no, lexeme):
-    if lexeme == chr(26):
-        return Token(TokenType.EOF, "$")
-    else:
-        return Token(TokenType.WHITE_SPACE, lexeme)
+    tables.error_table.end_run()
+    return Token(TokenType.WHITE_SPACE, lexeme)
+
+
+def eof_token_gen(line_no, lexeme): return Token(TokenType.EOF, "$")
 
 
 def error_gen(line_no, lexeme):
@@ -47,4 +50,13 @@ def error_gen(line_no, lexeme):
     else:
         error = tables.Error(line_no, lexeme, "Invalid input")
         tables.get_error_table().add_lexical_error(error)
-    return Token(TokenType.ERROR, lexeme)
+    # the token shows what the error shows, so no reader has to keep more of an unclosed comment than its start
+    return Token(TokenType.ERROR, error.characters)
+
+
+# actions that never look at their lexeme or line number; the scanner hands them None instead of working it out
+LEXEME_FREE_ACTIONS = (comment_token_gen, eof_token_gen)
+LINE_FREE_ACTIONS = (comment_token_gen, whitespace_token_gen, eof_token_gen)
+# actions whose tokens carry nothing a parser needs, with the type of token each would make; a scanner that skips
+# trivia counts these outcomes instead of calling them
+TRIVIA_ACTIONS = {comment_token_gen: TokenType.COMMENT, whitespace_token_gen: TokenType.WHITE_SPACE}
@@ -0,0 +1,59 @@
+from scanner.default_scanner import build_scanner, default_automaton
+from scanner.line_index import LineIndex
+from scanner.scanner import TokenBatches
+from scanner.transition_table import WIDTH
+
+
+class AsciiScanner(TokenBatches):
+    # runs the shared automaton over the raw bytes of an ASCII source: byte values index the transition table
+    # directly, and only the lexemes an action looks at are ever decoded
+    def __init__(self, data, automaton):
+        if b"\r" in data:  # universal newlines, like the text mode readers
+            data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        self.data = data + b"\x1a"
+        self.pointer = 0
+        self.automaton = automaton
+        self.table = automaton.table
+        self.runs = tuple(run and run.data for run in automaton.runs)
+        self.line_index = LineIndex(self.data, newline=b"\n")
+
+    def get_line_no(self):
+        return self.line_index.line_at(self.pointer)
+
+    def can_generate_token(self):
+        return self.pointer < len(self.data)
+
+    def get_next_token(self):
+        table, automaton = self.table, self.automaton
+        transitions, runs, data = table.transitions, self.runs, self.data
+        start = position = self.pointer
+        state = 0
+        try:
+            while True:
+                target = transitions[state * WIDTH + data[position]]
+                if target >= 0:
+                    position += 1
+                    state = target
+                    if runs[state] is not None:
+                        position = runs[state].match(data, position).end()
+                    continue
+                outcome = ~target
+                if not table.push_backs[outcome]:
+                    position += 1
+                break
+        except IndexError:  # the input ended inside a token, like an open // comment
+            self.pointer = len(data)
+            return None
+        self.pointer = position
+        lexeme = data[start:position].decode("ascii") if automaton.needs_lexeme[outcome] else None
+        line_no = self.line_index.line_at(start) if automaton.needs_line[outcome] else None
+        return table.actions[outcome](line_no, lexeme)
+
+
+def build_ascii_scanner(path, errors="strict"):
+    # non-ASCII sources take the text path of build_scanner
+    with open(path, "rb") as input_file:
+        data = input_file.read()
+    if not data.isascii():
+        return build_scanner(path, errors=errors)
+    return AsciiScanner(data, default_automaton())
@@ -0,0 +1,102 @@
+import hashlib
+import importlib.util
+import os
+import pickle
+import re
+from collections import namedtuple
+
+from scanner.actions import LEXEME_FREE_ACTIONS, LINE_FREE_ACTIONS
+from scanner.buffer_reader import BufferReader
+from scanner.scanner import Scanner
+from scanner.string_reader import StringReader
+from scanner.transition_table import compile_dfa, ALPHABET_SIZE, WIDTH
+
+# the characters a state loops on: text matches a run of them in str input, data in raw UTF-8 bytes (None if it can not)
+Run = namedtuple('Run', 'text data')
+
+GRAMMAR_MODULES = ("scanner.default_scanner", "scanner.automaton", "scanner.lang", "scanner.minimize",
+                   "scanner.transition_table")
+
+
+class Automaton(namedtuple('Automaton', 'table language needs_lexeme needs_line runs')):
+    # a compiled DFA that is bound to no input, so one instance can scan any number of sources
+    __slots__ = ()
+
+    def scan(self, source):
+        # a str is the program text itself, a path object names a file to read
+        if isinstance(source, os.PathLike):
+            return Scanner(self, BufferReader(source, 30))
+        return Scanner(self, StringReader(source))
+
+
+def char_class(codes, negated=False):
+    ranges = []
+    for code in sorted(codes):
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return "[" + "^" * negated + "".join(
+        re.escape(chr(low)) + ("-" + re.escape(chr(high)) if high > low else "") for low, high in ranges) + "]*"
+
+
+def run_pattern(columns):
+    # a state that loops on every code point past the table loops on all but a few characters, which is what
+    # the pattern names; stopping a run early is always safe, so the byte pattern also stops at CR, which the
+    # readers turn into a newline, and at non-ASCII bytes unless every non-ASCII character belongs to the run
+    if ALPHABET_SIZE in columns:
+        text = char_class(set(range(ALPHABET_SIZE)) - columns, negated=True)
+    else:
+        text = char_class(columns)
+    if all(column in columns for column in range(0x80, ALPHABET_SIZE + 1)):
+        data = char_class(set(range(0x80)) - columns | {13}, negated=True)
+    else:
+        data = char_class(columns & set(range(0x80)) - {13})
+    return Run(re.compile(text), re.compile(data.encode("latin-1")) if data != "[]*" else None)
+
+
+def state_runs(table):
+    runs = []
+    for state in range(table.state_count):
+        row = table.transitions[state * WIDTH:(state + 1) * WIDTH]
+        columns = {column for column, target in enumerate(row) if target == state}
+        runs.append(run_pattern(columns) if columns and table.skip_runs[state] else None)
+    return tuple(runs)
+
+
+def compile_automaton(root, language):
+    table = compile_dfa(root, language)
+    return Automaton(table, language.freeze(),
+                     tuple(action not in LEXEME_FREE_ACTIONS for action in table.actions),
+                     tuple(action not in LINE_FREE_ACTIONS for action in table.actions),
+                     state_runs(table))
+
+
+def grammar_hash(*paths):
+    # changes whenever the grammar or the way it is compiled does; paths adds files of its own, like a code
+    # generator's. The modules are found by name, default_scanner imports this one
+    digest = hashlib.sha256()
+    for path in [importlib.util.find_spec(module).origin for module in GRAMMAR_MODULES] + list(paths):
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def save_automaton(automaton, path):
+    # pickled together with the grammar hash, through a temporary file so no reader sees half a snapshot
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as snapshot:
+        pickle.dump((grammar_hash(), automaton), snapshot, pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def load_automaton(path):
+    # None unless path holds a snapshot of the current grammar
+    try:
+        with open(path, "rb") as snapshot:
+            source_hash, automaton = pickle.load(snapshot)
+    except Exception:  # missing, damaged, or pickled by an older layout that no longer unpickles
+        return None
+    if source_hash != grammar_hash() or not isinstance(automaton, Automaton):
+        return None
+    return automaton
@@ -1,49 +1,90 @@
+from scanner.line_index import LineIndex
+
+
 class BufferReader:
 
-    def __init__(self, path, buffer_size=100):
+    def __init__(self, path, buffer_size=100, errors="strict"):
 
         self.buffer_size = buffer_size
         self.buffer_pointer = 0
+        self.buffer_offset = 0
+        self.lexeme_start = None
         self.buffer = ""
-        self.line_no = 1
-        self.input_file = open(path, "r")
+        self.exhausted = False
+        self.line_index = LineIndex()
+        self.input_file = open(path, "r", errors=errors)
 
         self.__refill_buffer()
 
-    def push_back(self, char):
-        if char == '\n':
-            self.line_no -= 1
-        if self.buffer_pointer > 0:
-            self.buffer_pointer -= 1
-        else:
-            self.buffer = char + self.buffer
+    def tell(self):
+        return self.buffer_offset + self.buffer_pointer
+
+    def seek(self, offset):
+        # inside the buffer only the pointer moves; further back the file is read again from its start, but the
+        # newlines already indexed are not indexed twice
+        if offset < self.buffer_offset:
+            self.input_file.seek(0)
+            self.buffer, self.buffer_offset, self.exhausted = "", 0, False
+            self.lexeme_start = None
+            self.__refill_buffer()
+        while offset > self.buffer_offset + len(self.buffer) and not self.exhausted:
+            self.lexeme_start = None
+            self.buffer_pointer = len(self.buffer)
+            self.__refill_buffer()
+        self.buffer_pointer = min(offset - self.buffer_offset, len(self.buffer))
 
     def get_line_no(self):
-        return self.line_no
+        return self.line_index.line_at(self.buffer_offset + self.buffer_pointer)
 
-    def get_next_char(self):
-        if self.buffer_pointer == len(self.buffer):
-            self.__refill_buffer()
+    def get_column(self):
+        return self.line_index.column_at(self.buffer_offset + self.buffer_pointer)
 
-        next_char = self.buffer[self.buffer_pointer]
+    def get_lexeme_line_no(self):
+        return self.line_index.line_at(self.buffer_offset + self.lexeme_start)
+
+    def mark(self):
+        self.lexeme_start = self.buffer_pointer
+
+    def get_lexeme(self):
+        return self.buffer[self.lexeme_start:self.buffer_pointer]
+
+    def peek(self):
+        if self.buffer_pointer == len(self.buffer) and not self.has_next():
+            return -1
+        return ord(self.buffer[self.buffer_pointer])
+
+    def advance(self):
         self.buffer_pointer += 1
 
-        if next_char == '\n':
-            self.line_no += 1
-        return next_char
+    def skip(self, run):
+        while True:
+            self.buffer_pointer = run.text.match(self.buffer, self.buffer_pointer).end()
+            if self.buffer_pointer < len(self.buffer) or self.exhausted:
+                return
+            self.__refill_buffer()
 
     def __refill_buffer(self):
-        self.buffer = self.input_file.read(self.buffer_size)
-        if len(self.buffer) < self.buffer_size:
-            self.buffer += chr(26)
-        self.buffer_pointer = 0
+        # the marked lexeme is carried over, and at least as much is read again so long lexemes stay linear
+        kept = self.buffer[self.lexeme_start:] if self.lexeme_start is not None else ""
+        size = max(self.buffer_size, len(kept))
+        data = self.input_file.read(size)
+        if len(data) < size:
+            data += chr(26)
+            self.exhausted = True
+        self.buffer_offset += len(self.buffer) - len(kept)
+        base = self.buffer_offset + len(kept)
+        known = max(self.line_index.indexed - base, 0)
+        if known < len(data):
+            self.line_index.add(data[known:], base + known)
+        self.buffer = kept + data
+        self.buffer_pointer = len(kept)
+        if self.lexeme_start is not None:
+            self.lexeme_start = 0
 
     def has_next(self):
         if self.buffer_pointer < len(self.buffer):
             return True
-        elif self.buffer_pointer > len(self.buffer):
-            return False
-        elif len(self.buffer) < self.buffer_size:
+        elif self.exhausted:
             return False
         else:
             try:
@@ -57,19 +98,11 @@ if __name__ == "__main__":
     b = BufferReader("input.txt", 3)
     while b.has_next():
         print(f"buffer length:{len(b.buffer)}")
-        print(b.get_next_char() + "\n")
+        print(chr(b.peek()) + "\n")
+        b.advance()
 
     b = BufferReader("input.txt", 3)
-    b.has_next()
-    b.push_back("a")
-    print(f"buffer length:{len(b.buffer)}")
-    print(b.get_next_char() + "\n")
-    b.push_back("a")
-    print(b.get_next_char() + "\n")
-    b.push_back("a")
-    print(b.get_next_char() + "\n")
-    b.push_back("a")
-    print(b.get_next_char() + "\n")
-    b.push_back("a")
-    print(b.get_next_char() + "\n")
-    b.push_back("a")
+    print(chr(b.peek()) + "\n")
+    print(chr(b.peek()) + "\n")
+    b.advance()
+    print(chr(b.peek()) + "\n")
@@ -1,7 +1,11 @@
 from scanner import actions
+from scanner.automaton import compile_automaton, load_automaton, save_automaton
 from scanner.buffer_reader import BufferReader
+from scanner.minimize import minimize
+from scanner.mmap_reader import MemoryMappedReader
 from scanner.lang import DFANode, FinalStateNode, Edge
 from scanner.scanner import Scanner
+from scanner.stream_reader import StreamReader
 
 
 def number_regex(start):
@@ -47,10 +51,10 @@ def comment_regex(start):
     # implementing comments
     comment_start_state = DFANode(actions.error_gen, supports_all_langs=True)  # a
     a_error = FinalStateNode(actions.error_gen, push_back_mode=True, supports_all_langs=True)  # as a has no other
-    short_comment_middle_state = DFANode(actions.error_gen, supports_all_langs=True)  # b
+    short_comment_middle_state = DFANode(actions.error_gen, supports_all_langs=True, skip_runs=True)  # b
     comment_final_state = FinalStateNode(actions.comment_token_gen, push_back_mode=False,
                                          supports_all_langs=True)  # c
-    long_comment_start_state = DFANode(actions.error_gen, supports_all_langs=True)  # d
+    long_comment_start_state = DFANode(actions.error_gen, supports_all_langs=True, skip_runs=True)  # d
     long_comment_end_state = DFANode(actions.error_gen, supports_all_langs=True)  # e
     start.append(Edge().include("/"), comment_start_state)
     comment_start_state.append(Edge().include("/"), short_comment_middle_state) \
@@ -66,14 +70,18 @@ def comment_regex(start):
 
 
 def whitespace_regex(start):
-    # implementing whitespace
-    whitespace_final_state = FinalStateNode(
-        actions.whitespace_token_gen, False)
-    start.append(Edge().include('\t', '\r').include(' ').include(chr(26)), whitespace_final_state)
+    # implementing whitespace, a whole run of it is one token
+    whitespace_middle_state = DFANode(actions.whitespace_token_gen, supports_all_langs=True, skip_runs=True)
+    whitespace_final_state = FinalStateNode(actions.whitespace_token_gen, True)
+    eof_final_state = FinalStateNode(actions.eof_token_gen, False)
+    whitespace_middle_state.append(Edge().include('\t', '\r').include(' '), whitespace_middle_state).append(
+        Edge().exclude('\t', '\r').exclude(' '), whitespace_final_state)
+    start.append(Edge().include('\t', '\r').include(' '), whitespace_middle_state)
+    start.append(Edge().include(chr(26)), eof_final_state)
     return start
 
 
-def build_scanner(path):
+def build_dfa(minimized=True):
     start = DFANode(actions.error_gen)
     number_regex(start)
     id_regex(start)
@@ -86,6 +94,38 @@ def build_scanner(path):
         .include(':', '<').include(',').include('(', ')').include('[').include(']').include('{').include('}') \
         .include('+').include('-').include('=') \
         .include('\t', '\r').include(' ').include(chr(26))
-    return Scanner(start, BufferReader(path, 30), language)
+    if minimized:
+        minimize(start, language)
+    return start, language
 
 
+__automaton = None
+
+
+def default_automaton(snapshot=None):
+    # built once per process; with a snapshot path it is unpickled from there, or built and pickled there when the
+    # snapshot is missing or was made from another grammar
+    global __automaton
+    if __automaton is None:
+        if snapshot is not None:
+            __automaton = load_automaton(snapshot)
+        if __automaton is None:
+            __automaton = compile_automaton(*build_dfa())
+            if snapshot is not None:
+                save_automaton(__automaton, snapshot)
+    return __automaton
+
+
+def scan(source):
+    return default_automaton().scan(source)
+
+
+def build_scanner(path, memory_mapped=False, skip_trivia=False, errors="strict"):
+    # errors is how text mode decoding treats bytes that are not UTF-8, the memory-mapped reader always replaces them
+    input_provider = MemoryMappedReader(path) if memory_mapped else BufferReader(path, 30, errors)
+    return Scanner(default_automaton(), input_provider, skip_trivia)
+
+
+def build_stream_scanner(stream, skip_trivia=False):
+    # stream is a binary file object such as sys.stdin.buffer, read in bounded chunks as tokens are asked for
+    return Scanner(default_automaton(), StreamReader(stream), skip_trivia)
@@ -0,0 +1,154 @@
+import importlib.util
+import os
+
+from scanner import actions, automaton, default_scanner
+from scanner.line_index import LineIndex
+from scanner.scanner import TokenBatches
+from scanner.transition_table import ALPHABET_SIZE, WIDTH
+
+# the generated module is cached beside default_scanner.py and rebuilt once its hash no longer matches
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_generated_dfa.py")
+HASH_PREFIX = "# grammar hash: "
+
+
+def grammar_hash():
+    # this module shapes the generated code as well
+    return automaton.grammar_hash(__file__)
+
+
+def condition(columns):
+    # one membership test in a string constant; the last column stands for every code point past the table
+    chars = "".join(chr(column) for column in sorted(columns) if column < ALPHABET_SIZE)
+    tests = [f"char == {chars!r}" if len(chars) == 1 else f"char in {chars!r}"] if chars else []
+    if ALPHABET_SIZE in columns:
+        tests.append(f"char >= {chr(ALPHABET_SIZE)!r}")
+    return " or ".join(tests)
+
+
+def state_body(compiled, state, indent):
+    table = compiled.table
+    row = table.transitions[state * WIDTH:(state + 1) * WIDTH]
+    groups = {}
+    for column, target in enumerate(row):
+        groups.setdefault(target, []).append(column)
+    looping = state in groups
+    # the most common target needs no test, it is the else branch
+    branches = sorted(groups.items(), key=lambda group: (group[0] != state, -len(group[1])))
+    default = max(groups, key=lambda target: len(groups[target]))
+
+    def jump(target):
+        if target == state:
+            return "continue"
+        if target >= 0:
+            return f"state = {target}" + ("; break" if looping else "")
+        outcome = ~target
+        return f"return {outcome}, pos - 1" if table.push_backs[outcome] else f"return {outcome}, pos"
+
+    lines = []
+    if looping:
+        lines.append(f"{indent}while True:")
+        indent += "    "
+        if compiled.runs[state] is not None:
+            lines.append(f"{indent}pos = RUN_{state}(text, pos).end()")
+    lines.append(f"{indent}char = text[pos]; pos += 1")
+    keyword = "if"
+    for target, columns in branches:
+        if target == default:
+            continue
+        lines.append(f"{indent}{keyword} {condition(columns)}:")
+        lines.append(f"{indent}    {jump(target)}")
+        keyword = "elif"
+    if keyword == "if":
+        lines.append(f"{indent}{jump(default)}")
+    else:
+        lines.append(f"{indent}else:")
+        lines.append(f"{indent}    {jump(default)}")
+    return lines
+
+
+def generate_source(compiled, source_hash):
+    table = compiled.table
+    lines = [HASH_PREFIX + source_hash,
+             "# generated by scanner/generated_scanner.py from scanner/default_scanner.py, do not edit",
+             "import re",
+             "",
+             "from scanner import actions",
+             "",
+             "ACTIONS = (" + ", ".join(f"actions.{action.__name__}" for action in table.actions) + ")"]
+    lines.extend(f"RUN_{state} = re.compile({run.text.pattern!r}).match"
+                 for state, run in enumerate(compiled.runs) if run is not None)
+    lines.extend(["",
+                  "",
+                  "def match(text, pos):",
+                  "    # returns (outcome, end) of the token starting at pos, or (None, len(text)) if the text ends first",
+                  "    state = 0",
+                  "    try:",
+                  "        while True:"])
+    for state in range(table.state_count):
+        lines.append(f"            {'if' if state == 0 else 'elif'} state == {state}:")
+        lines.extend(state_body(compiled, state, " " * 16))
+    lines.extend(["    except IndexError:",
+                  "        return None, len(text)",
+                  ""])
+    return "\n".join(lines)
+
+
+def write_module(source_hash):
+    compiled = default_scanner.default_automaton()
+    for action in compiled.table.actions:
+        if getattr(actions, action.__name__, None) is not action:
+            raise ValueError(f"{action.__name__} is not a scanner.actions function, it cannot be generated")
+    source = generate_source(compiled, source_hash)
+    temporary = f"{CACHE_PATH}.{os.getpid()}.tmp"
+    with open(temporary, "w") as module:
+        module.write(source)
+    os.replace(temporary, CACHE_PATH)
+
+
+def load_module():
+    source_hash = grammar_hash()
+    try:
+        with open(CACHE_PATH, "r") as module:
+            cached = module.readline().rstrip("\n") == HASH_PREFIX + source_hash
+    except OSError:
+        cached = False
+    if not cached:
+        write_module(source_hash)
+    spec = importlib.util.spec_from_file_location("scanner._generated_dfa", CACHE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class GeneratedScanner(TokenBatches):
+    # runs the DFA as generated straight-line Python over the whole text, with no graph or table at run time
+    module = None
+
+    def __init__(self, text):
+        if GeneratedScanner.module is None:
+            GeneratedScanner.module = load_module()
+        self.text = text + chr(26)
+        self.pointer = 0
+        self.line_index = LineIndex(self.text)
+        self.needs_lexeme = tuple(action not in actions.LEXEME_FREE_ACTIONS for action in self.module.ACTIONS)
+        self.needs_line = tuple(action not in actions.LINE_FREE_ACTIONS for action in self.module.ACTIONS)
+
+    def get_line_no(self):
+        return self.line_index.line_at(self.pointer)
+
+    def can_generate_token(self):
+        return self.pointer < len(self.text)
+
+    def get_next_token(self):
+        start = self.pointer
+        outcome, self.pointer = self.module.match(self.text, start)
+        if outcome is None:
+            return None
+        lexeme = self.text[start:self.pointer] if self.needs_lexeme[outcome] else None
+        line_no = self.line_index.line_at(start) if self.needs_line[outcome] else None
+        return self.module.ACTIONS[outcome](line_no, lexeme)
+
+
+def build_generated_scanner(path, errors="strict"):
+    with open(path, "r", errors=errors) as input_file:
+        return GeneratedScanner(input_file.read())
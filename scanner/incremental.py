@@ -0,0 +1,80 @@
+from collections import namedtuple
+
+from scanner.default_scanner import default_automaton
+from tables import tables
+
+# start/end are offsets into the source (the EOF token covers the sentinel right after it)
+LexedToken = namedtuple('LexedToken', 'start end line_no token')
+
+def scanner_for(source):
+    return default_automaton().scan(source)
+
+
+def lex_from(scanner, start, line_no):
+    reader = scanner.input_provider
+    reader.seek(start, line_no)
+    while scanner.can_generate_token():
+        start, line_no = reader.pointer, reader.get_line_no()
+        token = scanner.get_next_token()
+        yield LexedToken(start, reader.pointer, line_no, token)
+
+
+class TokenStream:
+    # a gap buffer of tokens: the ones before the last edit are kept with absolute positions, the ones after it
+    # (in reverse) with positions counted back from the end of the source, which an edit before them never changes
+    def __init__(self, source):
+        self.source = source
+        self.last_line = source.count("\n") + 1
+        with tables.isolated():
+            self.before = list(lex_from(scanner_for(source), 0, 1))
+        self.after = []
+
+    def __flip(self, lexed):
+        # converts between the two coordinate systems, the mapping is its own inverse
+        end = len(self.source)
+        return LexedToken(end - lexed.start, end - lexed.end, self.last_line - lexed.line_no, lexed.token)
+
+    def __move_gap(self, offset):
+        # afterwards before holds exactly the tokens that end before offset
+        while self.before and self.before[-1].end >= offset:
+            self.after.append(self.__flip(self.before.pop()))
+        while self.after and len(self.source) - self.after[-1].end < offset:
+            self.before.append(self.__flip(self.after.pop()))
+
+    def edit(self, offset, deleted, inserted):
+        # re-runs the DFA from the first token the edit can reach until a boundary lines up with the old stream;
+        # a token ending right at offset is included since it may have used the edited character as lookahead
+        self.__move_gap(offset)
+        restart = self.__flip(self.after[-1])
+        self.last_line += inserted.count("\n") - self.source.count("\n", offset, offset + deleted)
+        self.source = self.source[:offset] + inserted + self.source[offset + deleted:]
+        edit_end = offset + len(inserted)
+
+        relexed = []
+        with tables.isolated():
+            for lexed in lex_from(scanner_for(self.source), restart.start, restart.line_no):
+                relexed.append(lexed)
+                if lexed.end < edit_end:
+                    continue
+                from_end = len(self.source) - lexed.end
+                while self.after and self.after[-1].start > from_end:
+                    self.after.pop()
+                if self.after and self.after[-1].start == from_end:
+                    break
+            else:
+                self.after.clear()
+        self.before.extend(relexed)
+        return relexed
+
+    def __iter__(self):
+        yield from self.before
+        for lexed in reversed(self.after):
+            yield self.__flip(lexed)
+
+    def tokens(self):
+        return list(self)
+
+
+def tokenize(source):
+    # every token including whitespace, comments and errors; the global tables are left untouched
+    return TokenStream(source)
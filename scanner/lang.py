@@ -33,15 +33,46 @@ class Edge:
         else:
             return self.contains_in_includes(char) or self.contains_in_excludes(char)
 
+    def freeze(self):
+        edge = Edge()
+        edge.__include_ranges = tuple(self.__include_ranges)
+        edge.__exclude_ranges = tuple(self.__exclude_ranges)
+        return FrozenEdge(edge)
+
+    def max_bound(self):
+        return max((end for _, end in self.__include_ranges + self.__exclude_ranges), default="\0")
+
+
+class FrozenEdge:
+    # 256-entry membership bitmap; characters past it fall back to the range checks
+    BITMAP_SIZE = 256
+
+    def __init__(self, edge):
+        self.__edge = edge
+        self.__bitmap = bytes(chr(code) in edge for code in range(self.BITMAP_SIZE))
+
+    def __contains__(self, char):
+        code = ord(char)
+        if code < self.BITMAP_SIZE:
+            return self.__bitmap[code] == 1
+        return char in self.__edge
+
+    def freeze(self):
+        return self
+
+    def max_bound(self):
+        return self.__edge.max_bound()
+
 
 class DFANode:
-    def __init__(self, action=None, supports_all_langs=False):
+    def __init__(self, action=None, supports_all_langs=False, skip_runs=False):
         self.action = action
         self.children = []
         self.supports_all_langs = supports_all_langs
+        self.skip_runs = skip_runs
 
     def append(self, edge, child):
-        self.children.append((edge, child))
+        self.children.append((edge.freeze(), child))
         return self
 
     def match(self, char):
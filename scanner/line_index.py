@@ -0,0 +1,43 @@
+from array import array
+from bisect import bisect_left
+
+
+class LineIndex:
+    # sorted offsets of the newlines of an input; line numbers are looked up with bisect only when asked for
+    BLOCK_SIZE = 1 << 12
+
+    def __init__(self, text=None, newline="\n", start=0, first_line=1):
+        self.text = text
+        self.newline = newline
+        self.first_line = first_line
+        self.newlines = array('q')
+        self.indexed = start
+
+    def add(self, chunk, base):
+        # bulk-indexes a chunk that starts at offset base, for inputs that arrive piece by piece
+        find, newline, newlines = chunk.find, self.newline, self.newlines
+        position = find(newline)
+        while position != -1:
+            newlines.append(base + position)
+            position = find(newline, position + 1)
+        self.indexed = base + len(chunk)
+
+    def __index_to(self, offset):
+        end = max(offset, self.indexed + self.BLOCK_SIZE)
+        find, newline, newlines = self.text.find, self.newline, self.newlines
+        position = find(newline, self.indexed, end)
+        while position != -1:
+            newlines.append(position)
+            position = find(newline, position + 1, end)
+        self.indexed = end
+
+    def line_at(self, offset):
+        if offset > self.indexed and self.text is not None:
+            self.__index_to(offset)
+        return bisect_left(self.newlines, offset) + self.first_line
+
+    def column_at(self, offset):
+        if self.text is not None:
+            return offset - self.text.rfind(self.newline, 0, offset)
+        index = bisect_left(self.newlines, offset)
+        return offset - (self.newlines[index - 1] + 1 if index else 0) + 1
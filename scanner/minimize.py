@@ -0,0 +1,117 @@
+from collections import defaultdict, namedtuple
+
+from scanner.lang import FinalStateNode
+from scanner.transition_table import check_bounds, column_chars
+
+StateCounts = namedtuple('StateCounts', 'before after')
+
+
+def reachable_nodes(root):
+    nodes, seen = [], set()
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        nodes.append(node)
+        pending.extend(child for _, child in reversed(node.children))
+    return nodes
+
+
+def transition_rows(nodes, language):
+    # row[column] is the index of the next node, or of a sink standing for the (action, push_back) the
+    # scanner ends with; finals are sinks too, so a final and a plain reject of the same outcome are alike
+    index = {id(node): position for position, node in enumerate(nodes)}
+    sinks = {}
+
+    def sink(action, push_back):
+        return sinks.setdefault((action, push_back), len(nodes) + len(sinks))
+
+    for node in nodes:
+        if isinstance(node, FinalStateNode):
+            sink(node.action, node.should_push_back())
+    chars = column_chars()
+    in_language = [char in language for char in chars]
+    rows = []
+    for node in nodes:
+        if isinstance(node, FinalStateNode):
+            rows.append(None)
+            continue
+        row = []
+        for column, char in enumerate(chars):
+            target = node.match(char) if in_language[column] or node.is_universal() else node.action
+            row.append(index[id(target)] if id(target) in index else sink(target, False))
+        rows.append(row)
+    return rows, sinks
+
+
+def initial_blocks(nodes, sinks):
+    blocks = defaultdict(set)
+    for position, node in enumerate(nodes):
+        key = (node.action, node.should_push_back()) if isinstance(node, FinalStateNode) else node.skip_runs
+        blocks[key].add(position)
+    for key, position in sinks.items():
+        blocks[key].add(position)
+    return list(blocks.values())
+
+
+def hopcroft(rows, blocks):
+    # columns every state treats alike are one input symbol
+    columns = [row for row in rows if row is not None]
+    symbols = list(dict.fromkeys(tuple(row[column] for row in columns) for column in range(len(columns[0]))))
+    sources = [position for position, row in enumerate(rows) if row is not None]
+    inverse = []
+    for targets in symbols:
+        predecessors = defaultdict(set)
+        for source, target in zip(sources, targets):
+            predecessors[target].add(source)
+        inverse.append(predecessors)
+
+    block_of = {state: number for number, block in enumerate(blocks) for state in block}
+    pending = set(range(len(blocks)))
+    while pending:
+        splitter = set(blocks[pending.pop()])
+        for predecessors in inverse:
+            touched = defaultdict(set)
+            for state in splitter:
+                for source in predecessors.get(state, ()):
+                    touched[block_of[source]].add(source)
+            for number, inside in touched.items():
+                outside = blocks[number] - inside
+                if not outside:
+                    continue
+                blocks[number] = inside
+                blocks.append(outside)
+                for state in outside:
+                    block_of[state] = len(blocks) - 1
+                if number in pending or len(outside) <= len(inside):
+                    pending.add(len(blocks) - 1)
+                else:
+                    pending.add(number)
+    return block_of
+
+
+def minimize(root, language):
+    # merges equivalent states in place: every edge is pointed at the first node of its class, root included,
+    # so each surviving node keeps its own edges and action and the scanner behaves exactly as before
+    nodes = reachable_nodes(root)
+    language = language.freeze()
+    check_bounds([language] + [edge for node in nodes for edge, _ in node.children])
+    rows, sinks = transition_rows(nodes, language)
+    block_of = hopcroft(rows, initial_blocks(nodes, sinks))
+
+    representatives = {}
+    for position, node in enumerate(nodes):
+        representatives.setdefault(block_of[position], node)
+    merged = {id(node): representatives[block_of[position]] for position, node in enumerate(nodes)}
+    for node in representatives.values():
+        node.children = [(edge, merged[id(child)]) for edge, child in node.children]
+    return StateCounts(len(nodes), len(reachable_nodes(root)))
+
+
+if __name__ == "__main__":
+    from scanner.default_scanner import build_dfa
+
+    counts = minimize(*build_dfa(minimized=False))
+    print(f"DFA states: {counts.before} before minimization, {counts.after} after")
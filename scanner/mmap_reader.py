@@ -0,0 +1,90 @@
+import mmap
+import re
+
+from scanner.line_index import LineIndex
+
+
+class MemoryMappedReader:
+    EOF = chr(26)
+
+    def __init__(self, path):
+        self.pointer = 0
+        self.lexeme_start = 0
+        self.next_length = 0
+        with open(path, "rb") as input_file:
+            try:
+                self.data = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty files can not be mapped
+                self.data = b""
+        self.view = memoryview(self.data)
+        self.size = len(self.data)
+        if re.search(rb"\r(?!\n)", self.data):  # a lone CR ends a line too, index every terminator up front
+            self.line_index = LineIndex(newline=b"\n")
+            self.line_index.newlines.extend(match.end() - 1 for match in re.finditer(rb"\r\n?|\n", self.data))
+        else:
+            self.line_index = LineIndex(self.data, newline=b"\n")
+
+    def tell(self):
+        return self.pointer
+
+    def seek(self, pointer):
+        self.pointer = pointer
+
+    def get_line_no(self):
+        return self.line_index.line_at(self.pointer)
+
+    def get_column(self):
+        return self.line_index.column_at(self.pointer)
+
+    def get_lexeme_line_no(self):
+        return self.line_index.line_at(self.lexeme_start)
+
+    def mark(self):
+        self.lexeme_start = self.pointer
+
+    def get_lexeme(self):
+        lexeme = str(self.view[self.lexeme_start:self.pointer], "utf-8", "replace")
+        if "\r" in lexeme:
+            lexeme = lexeme.replace("\r\n", "\n").replace("\r", "\n")
+        if self.pointer > self.size:
+            lexeme += self.EOF
+        return lexeme
+
+    def peek(self):
+        # the code point at the pointer; next_length remembers how many bytes advance() has to step over
+        if self.pointer >= self.size:
+            self.next_length = 1
+            return ord(self.EOF) if self.pointer == self.size else -1
+
+        byte = self.data[self.pointer]
+        if byte == 13:  # universal newlines, like the text mode BufferReader
+            self.next_length = 2 if self.data[self.pointer + 1:self.pointer + 2] == b"\n" else 1
+            return 10
+        self.next_length = 1
+        if byte < 0x80:
+            return byte
+        return self.__peek_multibyte(byte)
+
+    def __peek_multibyte(self, lead):
+        length = 4 if lead >= 0xF0 else 3 if lead >= 0xE0 else 2 if lead >= 0xC0 else 1
+        try:
+            code = ord(str(self.view[self.pointer:self.pointer + length], "utf-8"))
+        except UnicodeDecodeError:
+            return 0xFFFD
+        self.next_length = length
+        return code
+
+    def advance(self):
+        self.pointer += self.next_length
+
+    def skip(self, run):
+        if run.data is not None and self.pointer < self.size:
+            self.pointer = run.data.match(self.data, self.pointer).end()
+
+    def has_next(self):
+        return self.pointer <= self.size
+
+    def close(self):
+        self.view.release()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
@@ -0,0 +1,93 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from scanner import actions
+from scanner.default_scanner import default_automaton
+from scanner.scanner import Scanner
+from scanner.string_reader import StringReader
+from scanner.tokens import Token, TokenType
+from tables import tables
+
+# open_comment is (offset, line_no) of a /* that was still open when the chunk ran out, else None
+ChunkResult = namedtuple('ChunkResult', 'line_nos types lexemes errors identifiers open_comment')
+
+
+def split_chunks(text, chunk_size):
+    # cut right after a newline: only /* */ comments can run across such a cut
+    chunks, start = [], 0
+    while start < len(text):
+        end = text.find("\n", start + chunk_size)
+        end = len(text) if end == -1 else end + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks or [""]
+
+
+def lex_chunk(text, first_line):
+    with tables.isolated():
+        reader = StringReader(text, first_line)
+        scanner = Scanner(default_automaton(), reader)
+        token = start = None
+        while scanner.can_generate_token():
+            start = reader.pointer, reader.get_line_no()
+            token = scanner.get_next_token()
+
+        errors = tables.get_error_table().lexical_errors
+        open_comment = None
+        if token is not None and token.type is TokenType.ERROR and errors[-1].error_type == "Unclosed comment":
+            open_comment = start
+        token_table, strings = tables.get_token_table(), tables.get_intern_pool().strings
+        return ChunkResult(list(token_table.line_nos), list(token_table.types),
+                           [strings[lexeme_id] for lexeme_id in token_table.lexeme_ids], errors,
+                           [record.token.lexeme for record in tables.get_symbol_table().scopes[0].stack],
+                           open_comment)
+
+
+def merge_chunk(result, keep_open_comment):
+    errors = result.errors if keep_open_comment or result.open_comment is None else result.errors[:-1]
+    tables.get_token_table().extend(result.line_nos, result.types, result.lexemes)
+    tables.get_error_table().lexical_errors.extend(errors)
+    for lexeme in result.identifiers:
+        tables.get_symbol_table().add_symbol(Token(TokenType.ID, lexeme))
+
+
+def scan_parallel(path, chunk_size=1 << 20, max_workers=None):
+    # fills the global tables exactly like scanning the whole file with build_scanner would
+    with open(path, "r") as input_file:
+        text = input_file.read()
+    chunks = split_chunks(text, chunk_size)
+    first_lines = [1]
+    for chunk in chunks[:-1]:
+        first_lines.append(first_lines[-1] + chunk.count("\n"))
+
+    if len(chunks) == 1:
+        results = [lex_chunk(chunks[0], 1)]
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(lex_chunk, chunks, first_lines))
+
+    comment = None  # (line_no, first characters) of a /* still open where the merged chunks end
+    for index, result in enumerate(results):
+        text = chunks[index]
+        last = index == len(results) - 1
+        if comment:
+            # the speculative result started inside a comment, lex again only from where that comment ends
+            line_no, prefix = comment
+            close, eof = text.find("*/"), text.find(chr(26))
+            if close != -1 and (eof == -1 or close < eof):
+                end = close + 2
+                actions.comment_token_gen(line_no, None)
+            elif eof != -1 or last:
+                end = eof + 1 if eof != -1 else len(text)
+                # error_gen shows at most 7 characters of an unclosed comment
+                actions.error_gen(line_no, (prefix + text[:min(end, 8)] + ("" if eof != -1 else chr(26)))[:8])
+            else:
+                comment = line_no, (prefix + text[:8])[:8]
+                continue
+            comment, line_no = None, first_lines[index] + text.count("\n", 0, end)
+            text = text[end:]
+            result = lex_chunk(text, line_no)
+        merge_chunk(result, last)
+        if result.open_comment and not last:
+            offset, line_no = result.open_comment
+            comment = line_no, text[offset:offset + 8]
@@ -0,0 +1,62 @@
+import re
+
+from scanner import actions
+from scanner.scanner import TokenBatches
+
+# characters outside the C-minus alphabet, see the language edge in default_scanner.build_scanner
+NON_LANGUAGE = r"[^0-9a-zA-Z/*:;<,()\[\]{}+\-=\t-\r \x1a]"
+
+# order matters: every rule mirrors one path through the default_scanner DFA
+RULES = [
+    ("INVALID_NUM", r"[0-9]+(?:[A-Za-z]|" + NON_LANGUAGE + ")", actions.error_gen),
+    ("NUM", r"[0-9]+", actions.num_token_gen),
+    ("INVALID_ID", r"[A-Za-z][A-Za-z0-9]*" + NON_LANGUAGE, actions.error_gen),
+    ("ID", r"[A-Za-z][A-Za-z0-9]*", actions.id_token_gen),
+    ("EQUALS", r"==", actions.symbol_token_gen),
+    ("INVALID_ASSIGN", r"=" + NON_LANGUAGE, actions.error_gen),
+    ("ASSIGN", r"=", actions.symbol_token_gen),
+    ("INVALID_STAR", r"\*(?:/|" + NON_LANGUAGE + ")", actions.error_gen),
+    ("STAR", r"\*", actions.symbol_token_gen),
+    ("LINE_COMMENT", r"//[^\n]*\n", actions.comment_token_gen),
+    ("OPEN_LINE_COMMENT", r"//[^\n]*\Z", None),
+    ("COMMENT", r"/\*[^\x1a]*?\*/", actions.comment_token_gen),
+    ("UNCLOSED_COMMENT", r"/\*[^\x1a]*\x1a", actions.error_gen),
+    ("SLASH", r"/", actions.error_gen),
+    ("SYMBOL", r"[:;<,()\[\]{}+\-]", actions.symbol_token_gen),
+    ("WHITE_SPACE", r"[\t-\r ]+", actions.whitespace_token_gen),
+    ("EOF", r"\x1a", actions.eof_token_gen),
+    ("INVALID", r".", actions.error_gen),
+]
+
+TOKEN_PATTERN = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in RULES), re.DOTALL)
+RULE_ACTIONS = {name: action for name, _, action in RULES}
+
+
+class RegexScanner(TokenBatches):
+    def __init__(self, text):
+        self.text = text + chr(26)
+        self.pointer = 0
+        self.line_no = 1
+
+    def get_line_no(self):
+        return self.line_no
+
+    def can_generate_token(self):
+        return self.pointer < len(self.text)
+
+    def get_next_token(self):
+        if self.pointer >= len(self.text):
+            return None
+        match = TOKEN_PATTERN.match(self.text, self.pointer)
+        line_no = self.line_no
+        self.pointer = match.end()
+        self.line_no += self.text.count("\n", match.start(), self.pointer)
+        action = RULE_ACTIONS[match.lastgroup]
+        if action is None:
+            return None
+        return action(line_no, None if action in actions.LEXEME_FREE_ACTIONS else match.group())
+
+
+def build_regex_scanner(path, errors="strict"):
+    with open(path, "r", errors=errors) as input_file:
+        return RegexScanner(input_file.read())
@@ -1,11 +1,72 @@
-from scanner.lang import DFANode, FinalStateNode
+from collections import Counter, namedtuple
 
+from scanner.actions import TRIVIA_ACTIONS
+from scanner.tokens import TRIVIA
+from scanner.transition_table import ALPHABET_SIZE, WIDTH
+from tables import tables
 
-class Scanner:
-    def __init__(self, root, input_provider, language):
-        self.root = root
+BATCH_SIZE = 256
+
+# where a scanner stands between two tokens, when the DFA is always back at its root: the input offset, the line
+# there and the sizes of the tables
+ScannerState = namedtuple('ScannerState', 'offset line_no tables')
+
+
+class TokenBatches:
+    # the significant tokens of any scanner, each paired with the scanner's line once it has been read, which is
+    # the line a parser reports its errors on; trivia is dropped on the way
+    def next_batch(self, size, count_trivia=False):
+        # at most size (line_no, token) pairs, fewer only when the input is used up; with count_trivia the
+        # number of trivia tokens dropped is returned too
+        batch, trivia = [], 0
+        get_next_token, get_line_no = self.get_next_token, self.get_line_no
+        while len(batch) < size:
+            token = get_next_token()
+            if token is None:
+                break
+            if token.type in TRIVIA:
+                trivia += 1
+            else:
+                batch.append((get_line_no(), token))
+        return (batch, trivia) if count_trivia else batch
+
+    def __iter__(self):
+        while True:
+            batch = self.next_batch(BATCH_SIZE)
+            if not batch:
+                return
+            yield from batch
+
+
+class Scanner(TokenBatches):
+    # with skip_trivia, get_next_token consumes comments and whitespace without making tokens for them and only
+    # counts them; next_batch never makes them
+    def __init__(self, automaton, input_provider, skip_trivia=False):
+        self.automaton = automaton
         self.input_provider = input_provider
-        self.language = language
+        self.skip_trivia = skip_trivia
+        self.table = automaton.table
+        self.needs_lexeme = automaton.needs_lexeme
+        self.needs_line = automaton.needs_line
+        self.runs = automaton.runs
+        self.trivia_outcomes = tuple(action in TRIVIA_ACTIONS for action in self.table.actions)
+        self.trivia_counts = [0] * len(self.table.actions)
+
+    def trivia_stats(self):
+        # how many comments and whitespace runs were consumed without a token
+        stats = Counter()
+        for action, count in zip(self.table.actions, self.trivia_counts):
+            if count:
+                stats[TRIVIA_ACTIONS[action]] += count
+        return stats
+
+    def snapshot(self):
+        return ScannerState(self.input_provider.tell(), self.input_provider.get_line_no(), tables.sizes())
+
+    def restore(self, state):
+        # rewinds the input and drops whatever the tables gained since the snapshot
+        self.input_provider.seek(state.offset)
+        tables.truncate(state.tables)
 
     def get_line_no(self):
         return self.input_provider.get_line_no()
@@ -14,22 +75,71 @@ class Scanner:
         return self.input_provider.has_next()
 
     def get_next_token(self):
-        state = self.root
-        lexeme = ""
-        line_no = self.get_line_no()
+        transitions = self.table.transitions
+        runs = self.runs
+        input_provider = self.input_provider
         while True:
-            if isinstance(state, FinalStateNode):
-                if state.should_push_back():
-                    self.input_provider.push_back(lexeme[-1])
-                    lexeme = lexeme[:-1]
-                return state.action(line_no, lexeme)
-            elif not isinstance(state, DFANode):
-                return state(line_no, lexeme)
-
-            if not self.input_provider.has_next():
+            state = 0
+            input_provider.mark()
+            while True:
+                code = input_provider.peek()
+                if code < 0:  # the input ended inside a token, like an open // comment
+                    return None
+                target = transitions[state * WIDTH + (code if code < ALPHABET_SIZE else ALPHABET_SIZE)]
+                if target >= 0:
+                    input_provider.advance()
+                    state = target
+                    if runs[state] is not None:  # whatever the state loops on is taken in one step
+                        input_provider.skip(runs[state])
+                    continue
+                outcome = ~target
+                if not self.table.push_backs[outcome]:  # a push-back final accepts on its lookahead, leaving it unread
+                    input_provider.advance()
                 break
+            if self.skip_trivia and self.trivia_outcomes[outcome]:
+                self.trivia_counts[outcome] += 1
+                tables.error_table.end_run()
+                continue
+            lexeme = input_provider.get_lexeme() if self.needs_lexeme[outcome] else None
+            line_no = input_provider.get_lexeme_line_no() if self.needs_line[outcome] else None
+            return self.table.actions[outcome](line_no, lexeme)
 
-            lexeme += self.input_provider.get_next_char()
-            if lexeme[-1] not in self.language and not state.is_universal():
-                return state.action(line_no, lexeme)
-            state = state.match(lexeme[-1])
+    def next_batch(self, size, count_trivia=False):
+        # get_next_token inlined, so the lookups it repeats per token are made once per batch
+        transitions, push_backs, actions = self.table.transitions, self.table.push_backs, self.table.actions
+        runs, needs_lexeme, needs_line = self.runs, self.needs_lexeme, self.needs_line
+        trivia_outcomes, trivia_counts = self.trivia_outcomes, self.trivia_counts
+        input_provider = self.input_provider
+        mark, peek, advance, skip = input_provider.mark, input_provider.peek, input_provider.advance, input_provider.skip
+        batch, trivia = [], 0
+        while len(batch) < size:
+            state = 0
+            mark()
+            while True:
+                code = peek()
+                if code < 0:
+                    return (batch, trivia) if count_trivia else batch
+                target = transitions[state * WIDTH + (code if code < ALPHABET_SIZE else ALPHABET_SIZE)]
+                if target >= 0:
+                    advance()
+                    state = target
+                    if runs[state] is not None:
+                        skip(runs[state])
+                    continue
+                outcome = ~target
+                if not push_backs[outcome]:
+                    advance()
+                break
+            if trivia_outcomes[outcome]:
+                trivia += 1
+                trivia_counts[outcome] += 1
+                tables.error_table.end_run()
+                continue
+            lexeme = input_provider.get_lexeme() if needs_lexeme[outcome] else None
+            line_no = input_provider.get_lexeme_line_no() if needs_line[outcome] else None
+            token = actions[outcome](line_no, lexeme)
+            if token.type in TRIVIA:
+                trivia += 1
+            else:
+                batch.append((input_provider.get_line_no(), token))
+        return (batch, trivia) if count_trivia else batch
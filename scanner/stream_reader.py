@@ -0,0 +1,186 @@
+import io
+import re
+from array import array
+from bisect import bisect_left
+
+NEWLINE = re.compile(rb"\r\n?|\n")
+
+
+class StreamReader:
+    # reads a binary stream (a pipe, stdin) through two preallocated buffers that readinto fills in turn; the one
+    # not being scanned still holds the start of the current lexeme, and only a lexeme longer than a whole buffer
+    # is copied out, into carry, so memory stays at two buffers plus the longest token whatever the input size;
+    # a comment never needs its lexeme and an unclosed one shows only 7 characters, so it carries just a prefix
+    EOF = chr(26)
+    COMMENT_OPENERS = (b"/*", b"//")
+    COMMENT_PREFIX = 32  # bytes, 7 characters of up to 4 bytes each and the start of an 8th
+    # a held back CR or cut UTF-8 sequence plus at least one new byte must fit
+    MIN_BUFFER_SIZE = 4
+
+    def __init__(self, stream, buffer_size=1 << 16):
+        self.stream = stream
+        buffer_size = max(buffer_size, self.MIN_BUFFER_SIZE)
+        self.buffers = [bytearray(buffer_size), bytearray(buffer_size)]
+        self.lengths = [0, 0]
+        self.bases = [0, 0]
+        # per buffer: offsets of its line terminators, and the lines and last terminator before it
+        self.newlines = [array('q'), array('q')]
+        self.lines_before = [0, 0]
+        self.last_newline_before = [-1, -1]
+        self.current = 0
+        self.pointer = 0
+        self.next_length = 0
+        self.lexeme_start = 0
+        self.carry = bytearray()
+        self.carry_line = None
+        self.tail = b""
+        self.finished = False
+        self.__next_buffer()
+
+    def __line_index(self, offset):
+        # the buffer holding offset and how many of its terminators come before it
+        buffer = self.current if offset >= self.bases[self.current] else 1 - self.current
+        return buffer, bisect_left(self.newlines[buffer], offset - self.bases[buffer])
+
+    def __line_at(self, offset):
+        if offset < self.bases[1 - self.current]:  # only the start of a carried lexeme lies this far back
+            return self.carry_line
+        buffer, index = self.__line_index(offset)
+        return self.lines_before[buffer] + index + 1
+
+    def tell(self):
+        return self.bases[self.current] + self.pointer
+
+    def seek(self, offset):
+        # a stream can not be read again, so only the buffer being scanned can be returned to
+        pointer = offset - self.bases[self.current]
+        if not 0 <= pointer <= self.lengths[self.current] + 1:
+            raise io.UnsupportedOperation("a stream can only seek within the buffer being scanned")
+        self.pointer = pointer
+
+    def get_line_no(self):
+        return self.__line_at(self.bases[self.current] + self.pointer)
+
+    def get_column(self):
+        offset = self.bases[self.current] + self.pointer
+        buffer, index = self.__line_index(offset)
+        newline = self.bases[buffer] + self.newlines[buffer][index - 1] if index else self.last_newline_before[buffer]
+        return offset - newline
+
+    def get_lexeme_line_no(self):
+        return self.__line_at(self.lexeme_start)
+
+    def mark(self):
+        self.lexeme_start = self.bases[self.current] + self.pointer
+        if self.carry:
+            self.carry.clear()
+
+    def get_lexeme(self):
+        current, previous = self.current, 1 - self.current
+        parts = [self.carry]
+        if self.lexeme_start < self.bases[current]:
+            start = max(self.lexeme_start, self.bases[previous]) - self.bases[previous]
+            parts.append(self.buffers[previous][start:self.lengths[previous]])
+        start = max(self.lexeme_start - self.bases[current], 0)
+        parts.append(self.buffers[current][start:min(self.pointer, self.lengths[current])])
+        lexeme = b"".join(parts).decode("utf-8", "replace")
+        if "\r" in lexeme:
+            lexeme = lexeme.replace("\r\n", "\n").replace("\r", "\n")
+        if self.pointer > self.lengths[current]:
+            lexeme += self.EOF
+        return lexeme
+
+    def __next_buffer(self):
+        # the other buffer is refilled and becomes the current one; whatever part of the lexeme it still held
+        # is carried over first
+        current, other = self.current, 1 - self.current
+        if self.lexeme_start < self.bases[current]:
+            if not self.carry:
+                self.carry_line = self.__line_at(self.lexeme_start)
+            if self.carry[:2] not in self.COMMENT_OPENERS or len(self.carry) < self.COMMENT_PREFIX:
+                start = max(self.lexeme_start, self.bases[other]) - self.bases[other]
+                self.carry += self.buffers[other][start:self.lengths[other]]
+                if self.carry[:2] in self.COMMENT_OPENERS:
+                    del self.carry[self.COMMENT_PREFIX:]
+
+        buffer = self.buffers[other]
+        length = len(self.tail)
+        buffer[:length] = self.tail
+        while True:
+            read = self.stream.readinto(memoryview(buffer)[length:])
+            if not read:
+                self.finished = True
+                held = 0
+                break
+            length += read
+            held = self.__incomplete_tail(buffer, length)
+            if held < length:
+                break
+        self.tail = bytes(buffer[length - held:length])
+        length -= held
+
+        newlines = self.newlines[other]
+        del newlines[:]
+        newlines.extend(match.end() - 1 for match in NEWLINE.finditer(buffer, 0, length))
+        self.lines_before[other] = self.lines_before[current] + len(self.newlines[current])
+        if self.newlines[current]:
+            self.last_newline_before[other] = self.bases[current] + self.newlines[current][-1]
+        else:
+            self.last_newline_before[other] = self.last_newline_before[current]
+        self.bases[other] = self.bases[current] + self.lengths[current]
+        self.lengths[other] = length
+        self.current = other
+        self.pointer = 0
+
+    @staticmethod
+    def __incomplete_tail(buffer, length):
+        # bytes at the end that must wait for the next read: a CR that may start a CRLF, or a cut UTF-8 sequence
+        if buffer[length - 1] == 13:
+            return 1
+        for back in range(1, min(3, length) + 1):
+            byte = buffer[length - back]
+            if byte & 0xC0 != 0x80:
+                needed = 4 if byte >= 0xF0 else 3 if byte >= 0xE0 else 2 if byte >= 0xC0 else 1
+                return back if needed > back else 0
+        return 0
+
+    def peek(self):
+        # the code point at the pointer; next_length remembers how many bytes advance() has to step over
+        if self.pointer >= self.lengths[self.current]:
+            if not self.finished:
+                self.__next_buffer()
+            if self.pointer >= self.lengths[self.current]:
+                self.next_length = 1
+                return ord(self.EOF) if self.pointer == self.lengths[self.current] else -1
+
+        buffer, end = self.buffers[self.current], self.lengths[self.current]
+        byte = buffer[self.pointer]
+        if byte == 13:  # universal newlines, a CR is never the last byte of a buffer unless the input ends there
+            self.next_length = 2 if self.pointer + 1 < end and buffer[self.pointer + 1] == 10 else 1
+            return 10
+        self.next_length = 1
+        if byte < 0x80:
+            return byte
+        length = 4 if byte >= 0xF0 else 3 if byte >= 0xE0 else 2 if byte >= 0xC0 else 1
+        try:
+            code = ord(buffer[self.pointer:min(self.pointer + length, end)].decode("utf-8"))
+        except UnicodeDecodeError:
+            return 0xFFFD
+        self.next_length = length
+        return code
+
+    def advance(self):
+        self.pointer += self.next_length
+
+    def skip(self, run):
+        if run.data is not None and self.pointer < self.lengths[self.current]:
+            buffer = self.buffers[self.current]
+            self.pointer = run.data.match(buffer, self.pointer, self.lengths[self.current]).end()
+
+    def has_next(self):
+        if self.pointer < self.lengths[self.current]:
+            return True
+        if not self.finished:
+            self.__next_buffer()
+            return self.has_next()
+        return self.pointer == self.lengths[self.current]
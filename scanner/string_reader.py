@@ -0,0 +1,48 @@
+from scanner.line_index import LineIndex
+
+
+class StringReader:
+    def __init__(self, text, first_line=1):
+        self.text = text + chr(26)
+        self.pointer = 0
+        self.lexeme_start = 0
+        self.line_index = LineIndex(self.text, first_line=first_line)
+
+    def tell(self):
+        return self.pointer
+
+    def seek(self, pointer, line_no=None):
+        # a known line number lets the index start at pointer instead of scanning the text before it
+        self.pointer = pointer
+        if line_no is not None:
+            self.line_index = LineIndex(self.text, start=pointer, first_line=line_no)
+
+    def get_line_no(self):
+        return self.line_index.line_at(self.pointer)
+
+    def get_column(self):
+        return self.line_index.column_at(self.pointer)
+
+    def get_lexeme_line_no(self):
+        return self.line_index.line_at(self.lexeme_start)
+
+    def mark(self):
+        self.lexeme_start = self.pointer
+
+    def get_lexeme(self):
+        return self.text[self.lexeme_start:self.pointer]
+
+    def skip(self, run):
+        self.pointer = run.text.match(self.text, self.pointer).end()
+
+    def peek(self):
+        # the code point of the next character, -1 once the text is used up
+        if self.pointer < len(self.text):
+            return ord(self.text[self.pointer])
+        return -1
+
+    def advance(self):
+        self.pointer += 1
+
+    def has_next(self):
+        return self.pointer < len(self.text)
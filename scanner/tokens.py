@@ -1,5 +1,6 @@
 from collections import namedtuple
 from enum import Enum
+from types import MappingProxyType
 
 
 class TokenType(Enum):
@@ -33,3 +34,15 @@ class TokenType(Enum):
 
 
 Token = namedtuple('Token', 'type lexeme')
+
+KEYWORDS = ("if", "else", "void", "int", "while", "break", "switch", "default", "case", "return")
+SYMBOLS = (":", ";", ",", "[", "]", "(", ")", "{", "}", "+", "-", "*", "=", "<", "==")
+
+# every lexeme with a fixed meaning mapped to the one Token shared by all its occurrences, a symbol's type is
+# the sum of its characters
+LEXEME_TOKENS = MappingProxyType({**{keyword: Token(TokenType.KEYWORD, keyword) for keyword in KEYWORDS},
+                                  **{symbol: Token(TokenType(sum(ord(c) for c in symbol)), symbol)
+                                     for symbol in SYMBOLS}})
+
+# tokens the parser never sees: the scanner reports lexical errors itself
+TRIVIA = frozenset((TokenType.COMMENT, TokenType.WHITE_SPACE, TokenType.ERROR))
@@ -0,0 +1,74 @@
+from scanner.lang import FinalStateNode
+
+# characters 0..255 get their own column, every other code point shares the last one
+ALPHABET_SIZE = 256
+WIDTH = ALPHABET_SIZE + 1
+
+
+class TransitionTable:
+    # transitions[state * WIDTH + column] is either the next state (>= 0)
+    # or ~outcome, an index into the actions/push_backs arrays; skip_runs[state] marks the states whose
+    # self-loops usually run long enough to be worth consuming in one step
+    def __init__(self, transitions, actions, push_backs, state_count, skip_runs):
+        self.transitions = transitions
+        self.actions = actions
+        self.push_backs = push_backs
+        self.state_count = state_count
+        self.skip_runs = skip_runs
+
+
+def column_chars():
+    return [chr(code) for code in range(ALPHABET_SIZE + 1)]
+
+
+def collect_states(root):
+    states, index = [], {}
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if id(node) in index or isinstance(node, FinalStateNode):
+            continue
+        index[id(node)] = len(states)
+        states.append(node)
+        pending.extend(child for _, child in reversed(node.children))
+    return states, index
+
+
+def check_bounds(edges):
+    for edge in edges:
+        if ord(edge.max_bound()) >= ALPHABET_SIZE:
+            raise ValueError(f"edge bound {edge.max_bound()!r} does not fit the {ALPHABET_SIZE}-column table")
+
+
+def compile_dfa(root, language):
+    states, index = collect_states(root)
+    language = language.freeze()
+    check_bounds([language] + [edge for state in states for edge, _ in state.children])
+    outcomes = {}
+    actions, push_backs = [], []
+
+    def outcome(action, push_back):
+        key = (action, push_back)
+        if key not in outcomes:
+            outcomes[key] = len(actions)
+            actions.append(action)
+            push_backs.append(push_back)
+        return ~outcomes[key]
+
+    chars = column_chars()
+    in_language = [char in language for char in chars]
+    transitions = []
+    for state in states:
+        for column, char in enumerate(chars):
+            if not in_language[column] and not state.is_universal():
+                transitions.append(outcome(state.action, False))
+                continue
+            target = state.match(char)
+            if isinstance(target, FinalStateNode):
+                transitions.append(outcome(target.action, target.should_push_back()))
+            elif id(target) in index:
+                transitions.append(index[id(target)])
+            else:
+                transitions.append(outcome(target, False))
+    return TransitionTable(tuple(transitions), tuple(actions), tuple(push_backs), len(states),
+                           tuple(state.skip_runs for state in states))
@@ -0,0 +1,131 @@
+from scanner import actions
+from scanner.default_scanner import default_automaton
+from scanner.scanner import Scanner, TokenBatches
+from scanner.string_reader import StringReader
+
+try:
+    import numpy as np
+except ImportError:  # optional, only the vectorized scanner needs it
+    np = None
+
+DIGIT, LETTER, SYMBOL, WHITE_SPACE, EOF, STATEFUL, INVALID = range(7)
+DIGITS = "0123456789"
+
+
+def class_table():
+    table = np.full(257, INVALID, dtype=np.uint8)
+    for chars, char_class in ((DIGITS, DIGIT),
+                              ("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ", LETTER),
+                              (":;<,()[]{}+-", SYMBOL),
+                              ("\t\n\v\f\r ", WHITE_SPACE),
+                              (chr(26), EOF),
+                              ("/*=", STATEFUL)):
+        table[[ord(c) for c in chars]] = char_class
+    return table
+
+
+class VectorScanner(TokenBatches):
+    # classifies the source with numpy lookups a block at a time; only comments, '/', '*' and '=' go through the
+    # DFA, whose reader holds the one copy of the text
+    BLOCK_SIZE = 1 << 16
+
+    def __init__(self, text):
+        if np is None:
+            raise ImportError("the vectorized scanner needs numpy")
+        self.reader = StringReader(text)
+        self.text = self.reader.text
+        self.pointer = 0
+        self.line_no = 1
+        automaton = default_automaton()
+        self.language = automaton.language
+        self.dfa = Scanner(automaton, self.reader)
+        self.classes = class_table()
+        self.tokens = self.__generate()
+
+    def get_line_no(self):
+        return self.line_no
+
+    def can_generate_token(self):
+        return self.pointer < len(self.text)
+
+    def get_next_token(self):
+        return next(self.tokens, None)
+
+    def __classify(self, start, end):
+        block = self.text[start:end]
+        if block.isascii():
+            codes = np.frombuffer(block.encode("ascii"), dtype=np.uint8)
+        else:
+            codes = np.minimum(np.frombuffer(block.encode("utf-32-le"), dtype=np.uint32), 256)
+        return self.classes[codes]
+
+    def __runs(self):
+        # (start, end, class) of each run of letters and digits, of white space and of every other character; the
+        # boundaries are worked out a block at a time, so only one block of them is ever held
+        text = self.text
+        run_start = run_class = None
+        alnum_before = white_before = False
+        for block_start in range(0, len(text), self.BLOCK_SIZE):
+            classes = self.__classify(block_start, block_start + self.BLOCK_SIZE)
+            alnum, white = classes <= LETTER, classes == WHITE_SPACE
+            boundaries = np.empty(len(classes), dtype=bool)
+            boundaries[0] = not (alnum[0] and alnum_before or white[0] and white_before)
+            boundaries[1:] = ~((alnum[1:] & alnum[:-1]) | (white[1:] & white[:-1]))
+            alnum_before, white_before = alnum[-1], white[-1]
+            offsets = np.flatnonzero(boundaries)
+            for start, char_class in zip((offsets + block_start).tolist(), classes[offsets].tolist()):
+                if run_start is not None:
+                    yield run_start, start, run_class
+                run_start, run_class = start, char_class
+        yield run_start, len(text), run_class
+
+    def __generate(self):
+        text = self.text
+        for start, end, char_class in self.__runs():
+            if end <= self.pointer:
+                continue
+            if char_class <= LETTER:
+                yield from self.__alnum_run(max(start, self.pointer), end)
+            elif char_class == WHITE_SPACE:
+                start, self.pointer = max(start, self.pointer), end
+                token = actions.whitespace_token_gen(self.line_no, text[start:end])
+                self.line_no += text.count("\n", start, end)
+                yield token
+            elif char_class == EOF:
+                self.pointer = end
+                yield actions.eof_token_gen(self.line_no, None)
+            elif char_class == SYMBOL:
+                self.pointer = end
+                yield actions.symbol_token_gen(self.line_no, text[start])
+            elif char_class == INVALID:
+                self.pointer = end
+                yield actions.error_gen(self.line_no, text[start])
+            else:
+                self.reader.seek(start)
+                token = self.dfa.get_next_token()
+                self.pointer, self.line_no = self.reader.pointer, self.reader.get_line_no()
+                yield token
+
+    def __alnum_run(self, start, end):
+        # the same splits the DFA makes inside a run of letters and digits
+        text, language = self.text, self.language
+        while start < end:
+            if text[start] in DIGITS:
+                digits_end = end - len(text[start:end].lstrip(DIGITS))
+                if digits_end < end:
+                    token, start = actions.error_gen(self.line_no, text[start:digits_end + 1]), digits_end + 1
+                elif text[end] not in language:
+                    token, start = actions.error_gen(self.line_no, text[start:end + 1]), end + 1
+                else:
+                    token, start = actions.num_token_gen(self.line_no, text[start:end]), end
+            elif text[end] not in language:
+                token, start = actions.error_gen(self.line_no, text[start:end + 1]), end + 1
+            else:
+                token, start = actions.id_token_gen(self.line_no, text[start:end]), end
+            self.pointer = start
+            yield token
+
+
+def build_vector_scanner(path, errors="strict"):
+    with open(path, "r", errors=errors) as input_file:
+        return VectorScanner(input_file.read())
@@ -0,0 +1,29 @@
+class InternPool:
+    # one shared copy of every lexeme, identified by a small integer
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    def intern(self, lexeme):
+        lexeme_id = self.ids.get(lexeme)
+        if lexeme_id is None:
+            lexeme_id = self.ids[lexeme] = len(self.strings)
+            self.strings.append(lexeme)
+        return lexeme_id
+
+    def find(self, lexeme):
+        return self.ids.get(lexeme)
+
+    def lexeme(self, lexeme_id):
+        return self.strings[lexeme_id]
+
+    def canonical(self, lexeme):
+        return self.strings[self.intern(lexeme)]
+
+    def truncate(self, size):
+        for lexeme in self.strings[size:]:
+            del self.ids[lexeme]
+        del self.strings[size:]
+
+    def __len__(self):
+        return len(self.strings)
@@ -1,4 +1,4 @@
-from scanner.tokens import Token, TokenType
+from scanner.tokens import KEYWORDS, LEXEME_TOKENS, Token, TokenType
 
 
 # IDRecord = namedtuple('IDRecord', 'token element_type no_args type scope address')
@@ -7,8 +7,10 @@ from scanner.tokens import Token, TokenType
 # todo      correct implementation: from recordclass import recordclass
 #                                   IDRecord = recordclass('IDRecord', 'token element_type no_args type scope address')
 class IDRecord:
-    def __init__(self, token=None, element_type=None, no_args=None, id_type=None, scope=None, address=None):
+    def __init__(self, token=None, element_type=None, no_args=None, id_type=None, scope=None, address=None,
+                 lexeme_id=None):
         self.token = token
+        self.lexeme_id = lexeme_id
         self.element_type = element_type
         self.no_args = no_args
         self.id_type = id_type
@@ -23,28 +25,8 @@ class Scope:
     def __init__(self, parent=None):
         self.stack = []
         self.parent = parent
-
-    def append(self, token, force=False):
-        if force:
-            return self.__append(token)
-        id_record = self.get_IDrecord(token.lexeme)
-        if id_record:
-            return id_record
-        else:
-            return self.__append(token)
-
-    def __append(self, token):
-        id_record = IDRecord(token, None, None, None, self, None)
-        self.stack.append(id_record)
-        return id_record
-
-    def get_IDrecord(self, lexeme):
-        for record in self.stack:
-            if record.token.lexeme == lexeme:
-                return record
-        if self.parent:
-            return self.parent.get_IDrecord(lexeme)
-        return None
+        # undo log: the records of this scope that are visible in the symbol table's bindings, oldest first
+        self.bound = []
 
     def __str__(self):
         to_string = ""
@@ -53,37 +35,81 @@ class Scope:
 
 
 class __SymbolTable:
-    keyword = ["if", "else", "void", "int", "while", "break", "switch", "default", "case", "return"]
+    keyword = list(KEYWORDS)
 
-    def __init__(self):
+    def __init__(self, intern_pool):
+        self.intern_pool = intern_pool
         self.is_declaration = False
         self.scopes = []
         self.ids = []
+        # lexeme id -> the records it names, innermost scope last; a lookup is the top of one stack
+        self.bindings = {}
         self.scopes.append(Scope())
 
     def clear(self):
         self.scopes = []
         self.ids = []
+        self.bindings = {}
         self.scopes.append(Scope())
 
     def new_scope(self):
         self.scopes.append(Scope(self.scopes[-1]))
 
     def remove_scope(self):
-        self.scopes.pop()
+        scope = self.scopes.pop()
+        for record in reversed(scope.bound):
+            self.__unbind(record)
+
+    def truncate(self, size):
+        # drops the records the current scope gained after it held size of them
+        scope = self.get_current_scope()
+        for record in reversed(scope.stack[size:]):
+            if scope.bound and scope.bound[-1] is record:
+                scope.bound.pop()
+                self.__unbind(record)
+        del scope.stack[size:]
+
+    def __unbind(self, record):
+        records = self.bindings[record.lexeme_id]
+        records.pop()
+        if not records:
+            del self.bindings[record.lexeme_id]
 
     def get_current_scope(self):
         return self.scopes[-1]
 
+    def get_IDrecord(self, lexeme_id):
+        records = self.bindings.get(lexeme_id)
+        return records[-1] if records else None
+
     def add_symbol(self, token):
-        if token.lexeme in self.keyword:
-            return Token(TokenType.KEYWORD, token.lexeme)
-        self.get_current_scope().append(token, self.is_declaration)
+        fixed = LEXEME_TOKENS.get(token.lexeme)
+        if fixed is not None and fixed.type is TokenType.KEYWORD:
+            return fixed
+        lexeme_id = self.intern_pool.intern(token.lexeme)
+        if self.intern_pool.lexeme(lexeme_id) is not token.lexeme:
+            token = Token(token.type, self.intern_pool.lexeme(lexeme_id))
+        if self.is_declaration or self.get_IDrecord(lexeme_id) is None:
+            self.__declare(token, lexeme_id)
         self.set_declaration(False)
         return token
 
+    def __declare(self, token, lexeme_id):
+        # a redeclaration in the same scope is kept, but lookups still find the first record of the scope
+        scope = self.get_current_scope()
+        id_record = IDRecord(token, None, None, None, scope, None, lexeme_id)
+        scope.stack.append(id_record)
+        records = self.bindings.setdefault(lexeme_id, [])
+        if not records or records[-1].scope is not scope:
+            records.append(id_record)
+            scope.bound.append(id_record)
+        return id_record
+
     def fetch(self, lexeme):
-        return self.get_current_scope().get_IDrecord(lexeme)
+        lexeme_id = self.intern_pool.find(lexeme)
+        if lexeme_id is None:
+            return None
+        return self.get_IDrecord(lexeme_id)
 
     def set_declaration(self, state):
         self.is_declaration = state
@@ -1,3 +1,11 @@
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+
+from scanner.tokens import Token, TokenType
+from tables.internPool import InternPool
 from tables.symbolTable import __SymbolTable
 
 
@@ -8,12 +16,98 @@ class Error:
         self.error_type = error_type
 
 
+# how much each table holds, enough to roll the tables back to that point with truncate()
+TableSizes = namedtuple('TableSizes', 'lexemes tokens errors symbols')
+
+# limits on what garbage input may cost: coalesce joins invalid characters that follow each other directly into a
+# single error, per_line and per_file cap the errors kept, and scanning is aborted once invalid characters
+# make up more than max_invalid_ratio of the invalid characters and tokens seen; None turns a limit off
+ErrorBudget = namedtuple('ErrorBudget', 'coalesce per_line per_file max_invalid_ratio',
+                         defaults=(False, None, None, None))
+NO_BUDGET = ErrorBudget()
+# the invalid ratio is not judged on fewer characters and tokens than this
+RATIO_SAMPLE = 1000
+# a joined run shows this many characters and then "...", like an unclosed comment
+RUN_PREFIX = 7
+
+
+class LexicalErrorStorm(Exception):
+    pass
+
+
 class __ErrorTable:
-    def __init__(self):
+    def __init__(self, token_table, budget=NO_BUDGET):
         self.lexical_errors = []
+        self.token_table = token_table
+        self.budget = budget
+        self.coalesced = self.suppressed = self.invalid = 0
+        self.line_no = self.line_errors = 0
+        # the error an invalid character joins, and how many tokens the table held when the run started; None
+        # once anything else was scanned after it
+        self.run = self.run_tokens = None
+        self.run_cut = False
+        self.aborted_at = None
 
     def add_lexical_error(self, error):
+        if self.budget is NO_BUDGET:
+            self.lexical_errors.append(error)
+        else:
+            self.__add_within_budget(error)
+
+    def end_run(self):
+        # scanners call this for comments and whitespace, which never reach the token table
+        self.run_tokens = None
+
+    def __add_within_budget(self, error):
+        budget, tokens = self.budget, len(self.token_table)
+        if error.error_type == "Invalid input":
+            self.invalid += 1  # an invalid input error ends at its one invalid character, like abc@
+            seen = self.invalid + tokens
+            if budget.max_invalid_ratio is not None and seen >= RATIO_SAMPLE \
+                    and self.invalid > budget.max_invalid_ratio * seen:
+                self.aborted_at = error.lineno
+                raise LexicalErrorStorm(self.summary())
+            if budget.coalesce and self.run_tokens == tokens and self.line_no == error.lineno:
+                if self.run is None:  # the run started over a cap
+                    self.suppressed += 1
+                else:
+                    self.coalesced += 1
+                    if not self.run_cut:
+                        characters = self.run.characters + error.characters
+                        if len(characters) > RUN_PREFIX:
+                            characters, self.run_cut = characters[:RUN_PREFIX] + "...", True
+                        self.run.characters = characters
+                return
+            self.run_tokens = tokens
+        else:
+            self.run_tokens = None
+
+        if self.line_no != error.lineno:
+            self.line_no, self.line_errors = error.lineno, 0
+        if budget.per_line is not None and self.line_errors >= budget.per_line \
+                or budget.per_file is not None and len(self.lexical_errors) >= budget.per_file:
+            self.suppressed += 1
+            self.run = None
+            return
+        self.line_errors += 1
         self.lexical_errors.append(error)
+        self.run, self.run_cut = error, False
+
+    def truncate(self, size):
+        # the budget counters are not rewound, only the errors kept
+        del self.lexical_errors[size:]
+        self.run = self.run_tokens = None
+
+    def summary(self):
+        parts = [f"{len(self.lexical_errors)} lexical errors kept"]
+        if self.coalesced:
+            parts.append(f"{self.coalesced} invalid characters joined into runs")
+        if self.suppressed:
+            parts.append(f"{self.suppressed} errors over the caps dropped")
+        if self.aborted_at is not None:
+            parts.append(f"scanning aborted on line {self.aborted_at}, over {self.budget.max_invalid_ratio:.0%} "
+                         f"of the input is invalid")
+        return ", ".join(parts)
 
     def export(self, path):
         with open(path, "w") as file:
@@ -23,36 +117,80 @@ class __ErrorTable:
 
             for e in self.lexical_errors:
                 file.write(f"{e.lineno}.\t({e.characters}, {e.error_type})\n")
+            if self.coalesced or self.suppressed or self.aborted_at is not None:
+                file.write(f"# {self.summary()}\n")
 
 
 class __TokenTable:
-    def __init__(self):
-        self.tokens = []
+    # struct of arrays: one packed column per field, lexemes are referenced by their intern pool id
+    token_types = {token_type.value: token_type for token_type in TokenType}
+    # what export shows for each type: the part of its name before the first underscore, so SYMBOL_LT is SYMBOL
+    display_names = {token_type.value: token_type.name.split("_")[0] for token_type in TokenType}
+    EXPORT_BLOCK = 1 << 14
+
+    def __init__(self, intern_pool):
+        self.intern_pool = intern_pool
+        self.types = array('i')
+        self.line_nos = array('i')
+        self.lexeme_ids = array('i')
 
     def add_token(self, line_no, token):
-        self.tokens.append((line_no, token))
+        self.types.append(token.type.value)
+        self.line_nos.append(line_no)
+        self.lexeme_ids.append(self.intern_pool.intern(token.lexeme))
+
+    def extend(self, line_nos, types, lexemes):
+        self.line_nos.extend(line_nos)
+        self.types.extend(types)
+        self.lexeme_ids.extend(map(self.intern_pool.intern, lexemes))
+
+    @property
+    def tokens(self):
+        return iter(self)
+
+    def __iter__(self):
+        token_types, lexemes = self.token_types, self.intern_pool.strings
+        for line_no, type_value, lexeme_id in zip(self.line_nos, self.types, self.lexeme_ids):
+            yield line_no, Token(token_types[type_value], lexemes[lexeme_id])
+
+    def __len__(self):
+        return len(self.types)
+
+    def truncate(self, size):
+        del self.types[size:]
+        del self.line_nos[size:]
+        del self.lexeme_ids[size:]
 
     def export(self, path):
-        current_line_no = -1
+        # every distinct (type, lexeme) pair is formatted once, and lines are written a block at a time
+        display_names, lexemes = self.display_names, self.intern_pool.strings
+        shown = {}
+        lines, separator = [], ""
         with open(path, "w") as file:
-            for line_no, token in self.tokens:
-                if current_line_no != line_no:
-                    if current_line_no != -1: file.write("\n")
-                    current_line_no = line_no
-                    file.write(f"{line_no}.\t")
-                else:
-                    file.write(" ")
-                index = token.type.name.find("_")
-                token_type = (token.type.name[:index], token.type.name)[index == -1]
-                file.write(f"({token_type}, {token.lexeme})")
+            for line_no, group in groupby(zip(self.line_nos, self.types, self.lexeme_ids), itemgetter(0)):
+                items = []
+                for _, type_value, lexeme_id in group:
+                    key = type_value, lexeme_id
+                    item = shown.get(key)
+                    if item is None:
+                        item = shown[key] = f"({display_names[type_value]}, {lexemes[lexeme_id]})"
+                    items.append(item)
+                lines.append(f"{line_no}.\t" + " ".join(items))
+                if len(lines) == self.EXPORT_BLOCK:
+                    file.write(separator + "\n".join(lines))
+                    lines.clear()
+                    separator = "\n"
+            if lines:
+                file.write(separator + "\n".join(lines))
 
     def __str__(self):
-        return "\n".join([f"{line_no}:\t\t<{token.type.name},{token.lexeme}>" for line_no, token in self.tokens])
+        return "\n".join([f"{line_no}:\t\t<{token.type.name},{token.lexeme}>" for line_no, token in self])
 
 
-symbol_table = __SymbolTable()
-error_table = __ErrorTable()
-token_table = __TokenTable()
+intern_pool = InternPool()
+symbol_table = __SymbolTable(intern_pool)
+token_table = __TokenTable(intern_pool)
+error_table = __ErrorTable(token_table)
 
 
 def get_symbol_table(): return symbol_table
@@ -61,5 +199,44 @@ def get_symbol_table(): return symbol_table
 def get_token_table(): return token_table
 
 
+def get_intern_pool(): return intern_pool
+
+
 def get_error_table(): return error_table
 
+
+def set_error_budget(budget):
+    error_table.budget = budget
+
+
+def reset():
+    global intern_pool, symbol_table, error_table, token_table
+    intern_pool = InternPool()
+    symbol_table = __SymbolTable(intern_pool)
+    token_table = __TokenTable(intern_pool)
+    error_table = __ErrorTable(token_table)
+
+
+def sizes():
+    return TableSizes(len(intern_pool), len(token_table), len(error_table.lexical_errors),
+                      len(symbol_table.get_current_scope().stack))
+
+
+def truncate(table_sizes):
+    intern_pool.truncate(table_sizes.lexemes)
+    token_table.truncate(table_sizes.tokens)
+    error_table.truncate(table_sizes.errors)
+    symbol_table.truncate(table_sizes.symbols)
+
+
+@contextmanager
+def isolated():
+    # fresh tables for the duration of the block, the previous ones come back afterwards
+    global intern_pool, symbol_table, error_table, token_table
+    saved = intern_pool, symbol_table, error_table, token_table
+    reset()
+    try:
+        yield
+    finally:
+        intern_pool, symbol_table, error_table, token_table = saved
+
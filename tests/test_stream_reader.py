@@ -0,0 +1,70 @@
+import io
+import unittest
+
+from scanner.default_scanner import default_automaton
+from scanner.scanner import Scanner
+from scanner.stream_reader import StreamReader
+from scanner.string_reader import StringReader
+from tables import tables
+
+
+def scan(reader):
+    # every token with the line it ended on, then the lexical errors
+    scanner = Scanner(default_automaton(), reader)
+    with tables.isolated():
+        tokens = []
+        while scanner.can_generate_token():
+            token = scanner.get_next_token()
+            tokens.append((scanner.get_line_no(), token and (token.type, token.lexeme)))
+        errors = [(error.lineno, error.characters, error.error_type) for error in tables.get_error_table().lexical_errors]
+    return tokens, errors
+
+
+def assert_matches_string_reader(test, source):
+    text = source.decode("utf-8", "replace").replace("\r\n", "\n").replace("\r", "\n")
+    expected = scan(StringReader(text))
+    for buffer_size in range(StreamReader.MIN_BUFFER_SIZE, 12):
+        with test.subTest(source=source[:40], buffer_size=buffer_size):
+            test.assertEqual(scan(StreamReader(io.BytesIO(source), buffer_size)), expected)
+
+
+class CarriageReturnTest(unittest.TestCase):
+    # a CR at the end of the input must not be paired with bytes left in the buffer by an earlier read
+    SOURCES = [
+        b"/*ab\r\nxyz\r",
+        b"int a;\r\nvoid\rb\r",
+        b"/*\r\r\n*/x\r\n\r",
+        b"a\r\r\r\r\r\r",
+        b"// note\r\nint x\r",
+        b"/*ab\xc3\xa9\r\nxyz\r",
+    ]
+
+    def test_small_buffers(self):
+        for source in self.SOURCES:
+            assert_matches_string_reader(self, source)
+
+
+class LongCommentTest(unittest.TestCase):
+    # a comment spanning many buffers carries only its first bytes, an unclosed one still reports its start
+    SOURCES = [
+        b"int a;\n/*" + b"x" * 500 + b"*/ b",
+        b"int a;\n/*" + b"x\r\n" * 200,
+        b"/*\xc3\xa9\xe2\x82\xac\xf0\x9f\x98\x80\xc3\xa9\xc3\xa9" + b"y" * 300,
+        b"/*\r\n\r\n\r\n\r\n" + b"z" * 300,
+        b"a // " + b"w" * 300 + b"\nb",
+    ]
+
+    def test_small_buffers(self):
+        for source in self.SOURCES:
+            assert_matches_string_reader(self, source)
+
+    def test_carry_is_bounded(self):
+        reader = StreamReader(io.BytesIO(b"/*" + b"x" * 1000), 8)
+        reader.mark()
+        while reader.peek() >= 0:
+            reader.advance()
+            self.assertLessEqual(len(reader.carry), StreamReader.COMMENT_PREFIX)
+
+
+if __name__ == "__main__":
+    unittest.main()